@@ -3,13 +3,21 @@ Simple detection and logging script.
 Captures frames periodically and logs detections (placeholder for AI model).
 """
 
+import faulthandler
+import signal
+import sys
+import time
 from pathlib import Path
 
 import cv2
 
-from wingsight.camera.pi_camera import PiCamera
+from wingsight.camera.jpeg import save_jpeg
+from wingsight.camera.pi_camera import get_camera
 from wingsight.logging.csv_logger import CSVLogger
 
+# Save a frame when its mean brightness moves by more than this (0-255 scale)
+MEAN_CHANGE_THRESHOLD = 2.0
+
 
 def simple_detector(frame) -> tuple[str, float]:
     """
@@ -30,13 +38,13 @@ def simple_detector(frame) -> tuple[str, float]:
 def main() -> None:
     """Main detection loop."""
     # Setup
-    camera = PiCamera(resolution=(640, 480), framerate=15)
+    camera = get_camera(resolution=(640, 480), framerate=15)
     logger = CSVLogger(log_file="detections.csv")
     output_dir = Path(__file__).parent / "captures"
     output_dir.mkdir(exist_ok=True)
 
     print("Starting detection loop. Press Ctrl+C to stop.")
-    frame_count = 0
+    last_mean = None
 
     try:
         while True:
@@ -49,28 +57,35 @@ def main() -> None:
             # Run detection (placeholder for now)
             detection, confidence = simple_detector(frame)
 
-            # Save image if detection is interesting (for now, save every 10th frame)
+            # Save image if the scene changed (cv2.mean is a single SIMD pass)
             image_path = None
-            if frame_count % 10 == 0:
-                timestamp_str = cv2.getTickCount()  # Simple unique name
+            frame_mean = sum(cv2.mean(frame)[:3]) / 3
+            if last_mean is None or abs(frame_mean - last_mean) > MEAN_CHANGE_THRESHOLD:
+                last_mean = frame_mean
+                timestamp_str = time.time_ns()  # Unique even at high frame rates
                 image_path = output_dir / f"frame_{timestamp_str}.jpg"
-                cv2.imwrite(str(image_path), cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+                save_jpeg(str(image_path), frame)
                 image_path = str(image_path)
 
             # Log detection
             logger.log_detection(detection, confidence, image_path)
             print(f"Logged: {detection} (confidence: {confidence:.2f})")
 
-            frame_count += 1
             camera.sleep_between_frames()
 
     except KeyboardInterrupt:
         print("\nStopping detection loop...")
     finally:
         camera.close()
+        logger.close()
         print(f"Detection log saved to: {logger.log_file}")
 
 
 if __name__ == "__main__":
+    # Dump a traceback to the log if the native camera stack crashes
+    faulthandler.enable()
+    # stop_detection.sh stops the script with SIGTERM; exit through main's
+    # finally block so buffered log rows and pending images are written
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
     main()
 
@@ -2,18 +2,45 @@
 Smart motion-triggered detection script.
 Only saves images when objects are detected (not just motion).
 Includes cooldown to prevent too many images.
+Object detection runs on a background thread so capture never waits on YOLO.
 """
 
+import faulthandler
+import queue
+import signal
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-import cv2
-
-from wingsight.camera.pi_camera import PiCamera
+from wingsight.camera.jpeg import save_jpeg
+from wingsight.camera.pi_camera import get_camera
 from wingsight.detection.bird_detector import BirdDetector
 from wingsight.detection.motion_detector import MotionDetector
 from wingsight.logging.csv_logger import CSVLogger
 
+ROI_MARGIN = 32  # Pixels of context kept around the motion region for YOLO
+
+
+def _crop_to_motion(frame, box, motion_shape, margin: int = ROI_MARGIN):
+    """
+    Crop a frame to the motion bounding box (x, y, w, h) plus a margin.
+
+    The box is in the coordinates of the frame motion was detected on
+    (motion_shape), which may be a smaller luma frame.
+    """
+    if box is None:
+        return frame
+    height, width = frame.shape[:2]
+    scale_x = width / motion_shape[1]
+    scale_y = height / motion_shape[0]
+    x, y, w, h = box
+    return frame[
+        max(int(y * scale_y) - margin, 0) : min(int((y + h) * scale_y) + margin, height),
+        max(int(x * scale_x) - margin, 0) : min(int((x + w) * scale_x) + margin, width),
+    ]
+
 
 def main() -> None:
     """Main detection loop with smart capture - only saves when objects detected."""
@@ -21,9 +48,14 @@ def main() -> None:
     OBJECT_CONFIDENCE_THRESHOLD = 0.5  # Only save if object confidence > 0.5
     COOLDOWN_SECONDS = 10  # Max 1 image per 10 seconds
     MAX_IMAGES_PER_DAY = 100  # Safety limit (optional, can be removed)
+    BATCH_SIZE = 4  # Motion frames run through YOLO in one forward pass
+    BATCH_WINDOW_SECONDS = 0.2  # Max wait for a batch to fill up
+    # Skip YOLO when most of the frame changed at once: that is camera shake or
+    # a light change, not a bird (tiny changes are already below motion_threshold)
+    MAX_MOTION_FOR_YOLO = 0.5
 
     # Setup
-    camera = PiCamera(resolution=(640, 480), framerate=15)
+    camera = get_camera(resolution=(640, 480), framerate=15)
     motion_detector = MotionDetector(
         pixel_threshold=30,      # Pixels must differ by 30/255 to count
         motion_threshold=0.01,   # 1% of image must change
@@ -39,7 +71,8 @@ def main() -> None:
         return
     
     print("Object detector ready!\n")
-    logger = CSVLogger(log_file="detections.csv")
+    # Class names and generated image paths need no CSV quoting
+    logger = CSVLogger(log_file="detections.csv", fast=True)
     output_dir = Path(__file__).parent / "captures"
     output_dir.mkdir(exist_ok=True)
 
@@ -51,18 +84,109 @@ def main() -> None:
     frame_count = 0
     motion_count = 0
     saved_count = 0
-    last_save_time = 0
+    last_save_time = 0.0
+
+    # Bounded hand-off between the capture loop and the inference thread.
+    # The capture loop never waits for YOLO: if the detector is still busy
+    # and the queue is full, the oldest frame is replaced by the newer one.
+    frame_queue: queue.Queue = queue.Queue(maxsize=BATCH_SIZE)
+    stop_event = threading.Event()
+    # JPEG encoding + disk I/O release the GIL, so they overlap with inference
+    image_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="jpeg")
+
+    def enqueue(item) -> None:
+        """Queue an item for the inference thread, replacing the oldest one if full."""
+        try:
+            frame_queue.put_nowait(item)
+        except queue.Full:
+            try:
+                frame_queue.get_nowait()
+            except queue.Empty:
+                pass
+            frame_queue.put_nowait(item)
+
+    def next_batch() -> list:
+        """Collect up to BATCH_SIZE frames, waiting at most BATCH_WINDOW_SECONDS."""
+        try:
+            batch = [frame_queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + BATCH_WINDOW_SECONDS
+        while len(batch) < BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(frame_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def inference_worker() -> None:
+        """Run object detection on motion frames and save the interesting ones."""
+        nonlocal saved_count, last_save_time
+        while not stop_event.is_set():
+            batch = next_batch()
+            if not batch:
+                continue
+
+            # Frames may have been queued just before the last save
+            current_time = time.time()
+            if current_time - last_save_time < COOLDOWN_SECONDS:
+                continue
+
+            # Check for objects in the motion regions of all frames at once,
+            # keep the most confident one (the full frame is what gets saved)
+            frames = [frame for frame, _ in batch]
+            crops = [crop for _, crop in batch]
+            results = detector.detect_all_objects_batch(crops, min_confidence=OBJECT_CONFIDENCE_THRESHOLD)
+            frame, objects = max(
+                zip(frames, results),
+                key=lambda item: max((conf for _, conf in item[1]), default=0.0),
+            )
+
+            if objects:
+                # Objects detected! Save image
+                saved_count += 1
+                last_save_time = current_time
+
+                # Create filename with timestamp and detected objects
+                timestamp = time.strftime("%Y%m%d_%H%M%S")
+                object_names = "_".join([obj[0] for obj in objects[:3]])  # First 3 objects
+                filename = f"{timestamp}_{object_names}.jpg"
+                image_path = output_dir / filename
+
+                image_writer.submit(save_jpeg, str(image_path), frame)
+
+                # Log detection (use first object as primary)
+                primary_obj, primary_conf = objects[0]
+                logger.log_detection(primary_obj, primary_conf, str(image_path))
+
+                print(f"💾 Saved: {filename}")
+                print(f"   Objects: {', '.join([f'{name} ({conf:.2f})' for name, conf in objects[:5]])}")
+                print()
+            else:
+                # Motion but no objects detected - skip saving
+                if frame_count % 20 == 0:
+                    print(f"Motion detected but no objects found (confidence > {OBJECT_CONFIDENCE_THRESHOLD})")
+
+    worker = threading.Thread(target=inference_worker, name="inference", daemon=True)
+    worker.start()
 
     try:
         while True:
-            frame = camera.capture_frame()
-            if frame is None:
+            # Detect motion on the camera's luma stream when it has one, so the
+            # full colour frame is only fetched once something moves
+            luma = camera.capture_luma()
+            frame = None if luma is not None else camera.capture_frame()
+            motion_frame = luma if luma is not None else frame
+            if motion_frame is None:
                 print("Failed to capture frame, skipping...")
                 camera.sleep_between_frames()
                 continue
 
             # Check for motion
-            has_motion, motion_ratio = motion_detector.has_motion(frame)
+            has_motion, motion_ratio = motion_detector.has_motion(motion_frame)
 
             if has_motion:
                 motion_count += 1
@@ -75,34 +199,21 @@ def main() -> None:
                     # Still in cooldown, skip
                     if frame_count % 50 == 0:
                         print(f"Motion detected (cooldown: {COOLDOWN_SECONDS - time_since_last_save:.1f}s remaining)")
+                elif motion_ratio > MAX_MOTION_FOR_YOLO:
+                    # Implausible amount of motion for a bird, skip YOLO
+                    if frame_count % 50 == 0:
+                        print(f"Motion ignored ({motion_ratio:.1%} of frame changed)")
                 else:
-                    # Check for objects in frame
-                    objects = detector.detect_all_objects(frame, min_confidence=OBJECT_CONFIDENCE_THRESHOLD)
-                    
-                    if objects:
-                        # Objects detected! Save image
-                        saved_count += 1
-                        last_save_time = current_time
-                        
-                        # Create filename with timestamp and detected objects
-                        timestamp = time.strftime("%Y%m%d_%H%M%S")
-                        object_names = "_".join([obj[0] for obj in objects[:3]])  # First 3 objects
-                        filename = f"{timestamp}_{object_names}.jpg"
-                        image_path = output_dir / filename
-                        
-                        cv2.imwrite(str(image_path), cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
-                        
-                        # Log detection (use first object as primary)
-                        primary_obj, primary_conf = objects[0]
-                        logger.log_detection(primary_obj, primary_conf, str(image_path))
-                        
-                        print(f"💾 Saved: {filename}")
-                        print(f"   Objects: {', '.join([f'{name} ({conf:.2f})' for name, conf in objects[:5]])}")
-                        print()
-                    else:
-                        # Motion but no objects detected - skip saving
-                        if frame_count % 20 == 0:
-                            print(f"Motion detected but no objects found (confidence > {OBJECT_CONFIDENCE_THRESHOLD})")
+                    # On the luma path, fetch the colour frame captured together
+                    # with the luma the motion was detected on
+                    if frame is None:
+                        frame = camera.capture_frame()
+                    if frame is not None:
+                        # Hand the frame and its motion region to the inference thread
+                        # (copied: the camera reuses its frame buffer)
+                        frame = frame.copy()
+                        box = motion_detector.last_motion_box
+                        enqueue((frame, _crop_to_motion(frame, box, motion_frame.shape)))
             else:
                 # No motion - just skip (saves CPU)
                 if frame_count % 100 == 0:
@@ -121,10 +232,21 @@ def main() -> None:
         import traceback
         traceback.print_exc()
     finally:
+        stop_event.set()
+        # No timeout: the worker checks stop_event between batches, and the
+        # JPEG pool and logger must outlive a batch still being processed
+        worker.join()
+        image_writer.shutdown(wait=True)
         camera.close()
+        logger.close()
         print(f"Detection log saved to: {logger.log_file}")
 
 
 if __name__ == "__main__":
+    # Dump a traceback to the log if the native camera stack crashes
+    faulthandler.enable()
+    # stop_detection.sh stops the script with SIGTERM; exit through main's
+    # finally block so buffered log rows and pending images are written
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
     main()
 
@@ -5,15 +5,14 @@ Captures up to 100 frames and saves the first successful capture to disk.
 
 from pathlib import Path
 
-import cv2
-
-from wingsight.camera.pi_camera import PiCamera
+from wingsight.camera.jpeg import save_jpeg
+from wingsight.camera.pi_camera import get_camera
 
 
 def main() -> None:
     output_path = Path(__file__).parent / "capture.jpg"
 
-    camera = PiCamera(resolution=(640, 480), framerate=15)
+    camera = get_camera(resolution=(640, 480), framerate=15)
     saved = False
     try:
         for _ in range(100):
@@ -23,7 +22,7 @@ def main() -> None:
                 break
 
             if not saved:
-                cv2.imwrite(str(output_path), cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+                save_jpeg(str(output_path), frame)
                 print(f"Saved frame to {output_path}")
                 saved = True
 
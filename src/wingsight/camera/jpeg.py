@@ -0,0 +1,63 @@
+"""
+JPEG encoding for saved frames.
+Uses libjpeg-turbo directly through PyTurboJPEG when it is installed (its
+NEON/SSE DCT paths are 2-3x faster than many distro OpenCV builds), and
+falls back to OpenCV's encoder otherwise.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUALITY = 85
+
+_UNSET = object()
+_turbojpeg = _UNSET
+
+
+def _get_turbojpeg():
+    """Return a shared TurboJPEG instance, or None if it is unavailable."""
+    global _turbojpeg
+    if _turbojpeg is _UNSET:
+        try:
+            from turbojpeg import TurboJPEG
+
+            _turbojpeg = TurboJPEG()
+        except Exception as exc:  # ImportError, or libturbojpeg missing
+            logger.info("PyTurboJPEG not available (%s); using OpenCV JPEG encoder.", exc)
+            _turbojpeg = None
+    return _turbojpeg
+
+
+def encode_jpeg(frame: np.ndarray, quality: int = DEFAULT_QUALITY) -> Optional[bytes]:
+    """Encode a BGR frame as JPEG bytes (4:2:0 subsampling), or None on failure."""
+    turbojpeg = _get_turbojpeg()
+    if turbojpeg is not None:
+        from turbojpeg import TJSAMP_420
+
+        return turbojpeg.encode(frame, quality=quality, jpeg_subsample=TJSAMP_420)
+
+    ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return jpeg.tobytes() if ok else None
+
+
+def save_jpeg(path: str, frame: np.ndarray, quality: int = DEFAULT_QUALITY) -> bool:
+    """Encode a BGR frame and write it to path. Returns False if encoding failed."""
+    jpeg = encode_jpeg(frame, quality)
+    if jpeg is None:
+        logger.error("Failed to encode image: %s", path)
+        return False
+
+    with open(path, "wb") as f:
+        f.write(jpeg)
+    return True
+
+
+__all__ = ["encode_jpeg", "save_jpeg"]
@@ -7,8 +7,9 @@ Pi Camera (via picamera2) or an OpenCV-compatible USB camera fallback.
 from __future__ import annotations
 
 import logging
+import threading
 import time
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 import cv2
 import numpy as np
@@ -28,8 +29,26 @@ class PiCamera:
         """
         self.resolution = resolution
         self.framerate = framerate
+        # Half-size luma stream for cheap motion detection (picamera2 only)
+        self.luma_resolution = (resolution[0] // 2, resolution[1] // 2)
         self._camera = None
         self.camera_type: Optional[str] = None  # 'picamera2' or 'opencv'
+        # Frame handed out by capture_frame, reused on the next call
+        self._frame_buf: Optional[np.ndarray] = None
+        self._mapped_array = None  # picamera2.MappedArray
+        # Y plane handed out by capture_luma, and the request it came from,
+        # held so capture_frame can return the colour frame of the same instant
+        self._luma_buf: Optional[np.ndarray] = None
+        self._held_request = None
+        # OpenCV fallback: a reader thread keeps only the newest frame
+        self._reader: Optional[threading.Thread] = None
+        self._stop_reader = threading.Event()
+        self._frame_ready = threading.Condition()
+        self._latest_frame: Optional[np.ndarray] = None
+        self._latest_frame_id = 0
+        self._returned_frame_id = 0
+        # Deadline of the next frame slot, used by sleep_between_frames
+        self._next_deadline = time.monotonic()
         self._setup_camera()
 
     def _setup_camera(self) -> None:
@@ -38,11 +57,14 @@ class PiCamera:
             import sys
 
             sys.path.append("/usr/lib/python3/dist-packages")
-            from picamera2 import Picamera2
+            from picamera2 import MappedArray, Picamera2
 
             camera = Picamera2()
+            # libcamera's "RGB888" is stored B, G, R in memory, i.e. the
+            # BGR layout OpenCV works in, so frames need no conversion.
             config = camera.create_preview_configuration(
                 main={"size": self.resolution, "format": "RGB888"},
+                lores={"size": self.luma_resolution, "format": "YUV420"},
                 controls={
                     "FrameDurationLimits": (
                         1_000_000 // self.framerate,
@@ -53,6 +75,11 @@ class PiCamera:
             camera.configure(config)
             camera.start()
             self._camera = camera
+            self._mapped_array = MappedArray
+            self._frame_buf = np.empty((self.resolution[1], self.resolution[0], 3), dtype=np.uint8)
+            self._luma_buf = np.empty(
+                (self.luma_resolution[1], self.luma_resolution[0]), dtype=np.uint8
+            )
             self.camera_type = "picamera2"
             logger.info(
                 "PiCamera2 initialised at %s resolution, %s fps",
@@ -67,20 +94,54 @@ class PiCamera:
 
         self._setup_opencv_fallback()
 
+    def _gstreamer_pipeline(self, device: str = "/dev/video0") -> str:
+        """GStreamer pipeline whose appsink only ever holds the newest frame."""
+        width, height = self.resolution
+        return (
+            f"v4l2src device={device} ! "
+            f"video/x-raw,width={width},height={height},framerate={self.framerate}/1 ! "
+            "videoconvert ! video/x-raw,format=BGR ! "
+            "appsink drop=true max-buffers=1 sync=false"
+        )
+
     def _setup_opencv_fallback(self) -> None:
         """Fallback initialisation for systems without PiCamera2."""
         camera = None
         try:
-            for index in range(4):
-                camera = cv2.VideoCapture(index)
-                if camera.isOpened():
-                    break
-            if not camera or not camera.isOpened():
-                raise RuntimeError("No OpenCV camera available.")
+            # Prefer GStreamer: its appsink drops stale frames, so latency stays
+            # at about one frame instead of the ~4 frames V4L2 buffers by default.
+            camera = cv2.VideoCapture(self._gstreamer_pipeline(), cv2.CAP_GSTREAMER)
+            backend = "gstreamer"
+            if not camera.isOpened():
+                camera.release()
+                # Open the usual device directly, passing all properties at
+                # open time instead of one slow set() call each
+                backend = "v4l2"
+                camera = cv2.VideoCapture(
+                    "/dev/video0",
+                    cv2.CAP_V4L2,
+                    [
+                        cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0],
+                        cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1],
+                        cv2.CAP_PROP_FPS, self.framerate,
+                        cv2.CAP_PROP_BUFFERSIZE, 1,
+                    ],
+                )
+            if not camera.isOpened():
+                camera.release()
+                backend = "index scan"
+                for index in range(4):
+                    camera = cv2.VideoCapture(index)
+                    if camera.isOpened():
+                        break
+                if not camera or not camera.isOpened():
+                    raise RuntimeError("No OpenCV camera available.")
 
-            camera.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
-            camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
-            camera.set(cv2.CAP_PROP_FPS, self.framerate)
+                camera.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
+                camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
+                camera.set(cv2.CAP_PROP_FPS, self.framerate)
+                # Keep a single driver buffer so reads return the newest frame
+                camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
             ret, frame = camera.read()
             if not ret or frame is None:
@@ -88,7 +149,11 @@ class PiCamera:
 
             self._camera = camera
             self.camera_type = "opencv"
-            logger.info("OpenCV camera fallback initialised.")
+            self._reader = threading.Thread(
+                target=self._read_loop, args=(camera,), name="camera-reader", daemon=True
+            )
+            self._reader.start()
+            logger.info("OpenCV camera fallback initialised (%s).", backend)
         except Exception as exc:
             logger.error("Failed to initialise OpenCV camera: %s", exc)
             if camera:
@@ -96,42 +161,145 @@ class PiCamera:
             self._camera = None
             self.camera_type = None
 
+    def _read_loop(self, camera) -> None:
+        """
+        Read OpenCV frames continuously, keeping only the newest one.
+
+        Drivers that ignore CAP_PROP_BUFFERSIZE still queue several frames;
+        draining them here means capture_frame never returns a stale scene.
+        Frames are read into recycled buffers (triple buffering with the
+        latest and the caller's frame), so reading allocates nothing.
+        """
+        back: Optional[np.ndarray] = None
+        while not self._stop_reader.is_set():
+            ret, frame = camera.read() if back is None else camera.read(back)
+            if not ret or frame is None:
+                time.sleep(0.01)
+                continue
+            with self._frame_ready:
+                back, self._latest_frame = self._latest_frame, frame
+                self._latest_frame_id += 1
+                self._frame_ready.notify_all()
+
     def capture_frame(self) -> Optional[np.ndarray]:
-        """Return a single RGB frame or None if capture fails."""
+        """
+        Return a single BGR frame (OpenCV channel order) or None if capture fails.
+
+        The returned array is a reused buffer that the next capture_frame()
+        call overwrites; copy it if it has to outlive that call. On picamera2,
+        a call following capture_luma() returns the frame captured together
+        with that luma frame instead of waiting for a new one.
+        """
         if self._camera is None or self.camera_type is None:
             return None
 
         try:
             if self.camera_type == "picamera2":
-                frame = self._camera.capture_array()
-                if frame is None:
-                    return None
-                if len(frame.shape) == 3 and frame.shape[2] == 3:
-                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                return frame
+                # Copy straight out of the camera's DMA buffer into ours
+                request, self._held_request = self._held_request, None
+                if request is None:
+                    request = self._camera.capture_request()
+                try:
+                    with self._mapped_array(request, "main") as mapped:
+                        width = self._frame_buf.shape[1]
+                        np.copyto(self._frame_buf, mapped.array[:, :width, :3])
+                finally:
+                    request.release()
+                return self._frame_buf
 
             if self.camera_type == "opencv":
-                ret, frame = self._camera.read()
-                if not ret or frame is None:
-                    return None
-                return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                # Wait for a frame newer than the one returned last time
+                with self._frame_ready:
+                    if not self._frame_ready.wait_for(
+                        lambda: self._latest_frame_id != self._returned_frame_id, timeout=1.0
+                    ):
+                        return None
+                    self._returned_frame_id = self._latest_frame_id
+                    # Hand out the latest buffer; the previous one goes back to the reader
+                    self._frame_buf, self._latest_frame = self._latest_frame, self._frame_buf
+                    return self._frame_buf
         except Exception as exc:
             logger.error("Error capturing frame: %s", exc)
             return None
 
         return None
 
+    def capture_luma(self) -> Optional[np.ndarray]:
+        """
+        Return a low-resolution grayscale frame, or None if not available.
+
+        Only picamera2 provides one: the Y plane of the YUV420 lores stream is
+        already grayscale, so no colour conversion is needed. Callers should
+        fall back to capture_frame() when this returns None.
+
+        The camera request stays held until the next capture call, so a
+        capture_frame() right after returns the colour frame of this same
+        instant. The returned array is a reused buffer, like capture_frame's.
+        """
+        if self._camera is None or self.camera_type != "picamera2":
+            return None
+
+        self._release_held_request()
+        try:
+            request = self._camera.capture_request()
+        except Exception as exc:
+            logger.error("Error capturing luma frame: %s", exc)
+            return None
+
+        try:
+            width, height = self.luma_resolution
+            # YUV420 arrives as one (1.5 * height, stride) array; Y comes first
+            with self._mapped_array(request, "lores") as mapped:
+                np.copyto(self._luma_buf, mapped.array[:height, :width])
+        except Exception as exc:
+            request.release()
+            logger.error("Error capturing luma frame: %s", exc)
+            return None
+        self._held_request = request
+        return self._luma_buf
+
+    def _release_held_request(self) -> None:
+        """Give the request held by capture_luma back to the camera."""
+        if self._held_request is not None:
+            self._held_request.release()
+            self._held_request = None
+
     def sleep_between_frames(self) -> None:
-        """Sleep to respect requested framerate."""
-        if self.framerate > 0:
-            time.sleep(1.0 / self.framerate)
+        """
+        Sleep until the next frame slot to respect the requested framerate.
+
+        Time spent capturing and processing counts towards the frame period,
+        so slow frames are not followed by a full extra sleep. If the loop
+        has fallen behind, the schedule restarts from now instead of
+        bursting to catch up.
+        """
+        if self.framerate <= 0:
+            return
+
+        self._next_deadline += 1.0 / self.framerate
+        delay = self._next_deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            self._next_deadline = time.monotonic()
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the camera is initialised and not yet closed."""
+        return self._camera is not None
 
     def close(self) -> None:
         """Release camera resources."""
         if self._camera is None:
             return
 
+        if self._reader is not None:
+            self._stop_reader.set()
+            self._reader.join(timeout=2)
+            self._reader = None
+
         try:
+            self._release_held_request()
             if hasattr(self._camera, "close"):
                 self._camera.close()
             else:
@@ -141,6 +309,27 @@ class PiCamera:
             logger.info("Camera resources released.")
 
 
-__all__ = ["PiCamera"]
+_open_cameras: Dict[Tuple[Tuple[int, int], int], PiCamera] = {}
+_open_cameras_lock = threading.Lock()
+
+
+def get_camera(resolution: Tuple[int, int] = (640, 480), framerate: int = 30) -> PiCamera:
+    """
+    Return a shared, open PiCamera for these settings.
+
+    Opening a camera probes devices and configures the driver, which takes a
+    while; repeated calls in one process reuse the open camera instead. A
+    camera that has been closed is reopened.
+    """
+    key = (tuple(resolution), framerate)
+    with _open_cameras_lock:
+        camera = _open_cameras.get(key)
+        if camera is None or not camera.is_open:
+            camera = PiCamera(resolution=resolution, framerate=framerate)
+            _open_cameras[key] = camera
+        return camera
+
+
+__all__ = ["PiCamera", "get_camera"]
 
 
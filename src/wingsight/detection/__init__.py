@@ -1,7 +1,25 @@
 """Motion detection and bird detection utilities for WingSight."""
 
-from wingsight.detection.bird_detector import BirdDetector
-from wingsight.detection.motion_detector import MotionDetector
+from importlib import import_module
+
+# Submodules are imported on first attribute access (PEP 562), so importing
+# one detector does not pay for the other's dependencies (numba, torch).
+_LAZY_ATTRS = {
+    "BirdDetector": "wingsight.detection.bird_detector",
+    "MotionDetector": "wingsight.detection.motion_detector",
+}
 
 __all__ = ["MotionDetector", "BirdDetector"]
 
+
+def __getattr__(name: str):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
@@ -1,8 +1,288 @@
 """Simple frame-differencing motion detector."""
 
+import math
+import weakref
+from multiprocessing.shared_memory import SharedMemory
+
 import cv2
 import numpy as np
 
+try:
+    from numba import config as numba_config
+    from numba import njit, prange
+except ImportError:  # Numba is optional; OpenCV handles the diff without it
+    njit = None
+
+
+if njit is not None:
+
+    @njit(inline="always")
+    def _luma(frame: np.ndarray, y: int, x: int) -> int:
+        """Fixed-point BT.601 luma of one BGR pixel, rounded (single-channel frames pass through)."""
+        if frame.shape[2] == 1:
+            return np.int32(frame[y, x, 0])
+        return (
+            29 * np.int32(frame[y, x, 0])
+            + 150 * np.int32(frame[y, x, 1])
+            + 77 * np.int32(frame[y, x, 2])
+            + 128
+        ) >> 8
+
+    @njit(inline="always")
+    def _reflect(i: int, n: int) -> int:
+        """Mirror an out-of-range index like OpenCV's default BORDER_REFLECT_101."""
+        if n == 1:
+            return 0
+        # Repeat for kernels wider than the frame, as cv2.borderInterpolate does
+        while i < 0 or i >= n:
+            i = -i if i < 0 else 2 * n - 2 - i
+        return i
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _motion_kernel(
+        frame: np.ndarray,
+        prev_gray: np.ndarray,
+        out_gray: np.ndarray,
+        weights: np.ndarray,
+        pix_thresh: int,
+        scratch: np.ndarray,
+        ring_rows: np.ndarray,
+        row_first: np.ndarray,
+        row_last: np.ndarray,
+    ) -> int:
+        """
+        Luma, separable blur, diff, threshold and count in one pass.
+
+        frame is HxWxC (C=3 for BGR, 1 for luma). weights is the 1D blur
+        kernel in 8-bit fixed point (sums to 256). The blurred luma goes to
+        out_gray and is compared against prev_gray; no other image is
+        written. The rows are split into one band per scratch entry, run in
+        parallel. Each band keeps the luma of the last len(weights) source
+        rows in scratch[band, :taps], a ring indexed by row % taps (the row
+        held by each slot is tracked in ring_rows[band, :taps]), so every
+        pixel is converted to luma once. scratch[band, taps] holds the
+        vertical sums, padded by len(weights) // 2 on each side, and
+        scratch[band, taps + 1] the horizontal sums.
+        row_first/row_last receive the first/last changed column of each row
+        (-1 if none), for the motion bounding box.
+        """
+        height, width = out_gray.shape
+        taps = weights.shape[0]
+        radius = taps // 2
+        bands = scratch.shape[0]
+        changed = 0
+        for band in prange(bands):
+            luma = scratch[band]
+            column = scratch[band, taps]
+            sums = scratch[band, taps + 1]
+            loaded = ring_rows[band, :taps]
+            slots = ring_rows[band, taps:]
+            loaded[:] = -1
+            band_changed = 0
+            for y in range(band * height // bands, (band + 1) * height // bands):
+                # Convert any source row of this window not yet in the ring.
+                # The window's distinct rows span at most taps consecutive
+                # rows, so row % taps never maps two of them to one slot.
+                for t in range(taps):
+                    row = _reflect(y + t - radius, height)
+                    slot = row % taps
+                    slots[t] = slot
+                    if loaded[slot] != row:
+                        loaded[slot] = row
+                        ring_row = luma[slot]
+                        for x in range(width):
+                            ring_row[x] = _luma(frame, row, x)
+
+                # Vertical pass: weighted luma of the rows around y, per
+                # column (tap-outer so the inner loop is a plain vector MAC)
+                vertical = column[radius:radius + width]
+                vertical[:] = 0
+                for t in range(taps):
+                    weight = weights[t]
+                    ring_row = luma[slots[t]]
+                    for x in range(width):
+                        vertical[x] += weight * ring_row[x]
+
+                # Mirror the edge columns into the padding so the horizontal pass
+                # needs no border checks
+                for r in range(1, radius + 1):
+                    column[radius - r] = column[radius + _reflect(-r, width)]
+                    column[radius + width - 1 + r] = column[radius + _reflect(width - 1 + r, width)]
+
+                # Horizontal pass
+                sums[:width] = 0
+                for t in range(taps):
+                    weight = weights[t]
+                    for x in range(width):
+                        sums[x] += weight * column[x + t]
+
+                # Diff against the previous frame and count (branch-free)
+                row_changed = 0
+                for x in range(width):
+                    blurred = (sums[x] + (1 << 15)) >> 16
+                    out_gray[y, x] = blurred
+                    row_changed += abs(blurred - np.int32(prev_gray[y, x])) > pix_thresh
+
+                # First/last changed column, scanning in from each edge
+                first = -1
+                last = -1
+                if row_changed:
+                    first = 0
+                    while abs(np.int32(out_gray[y, first]) - np.int32(prev_gray[y, first])) <= pix_thresh:
+                        first += 1
+                    last = width - 1
+                    while abs(np.int32(out_gray[y, last]) - np.int32(prev_gray[y, last])) <= pix_thresh:
+                        last -= 1
+                row_first[y] = first
+                row_last[y] = last
+                band_changed += row_changed
+            changed += band_changed
+        return changed
+
+    @njit(parallel=True, cache=True)
+    def _count_above(words: np.ndarray, tail: np.ndarray, pix_thresh: int) -> int:
+        """
+        Count the bytes greater than pix_thresh, eight at a time (SWAR).
+
+        words is the diff image viewed as uint64, tail the leftover bytes.
+        Adding a bias to the low 7 bits of each byte carries into its high
+        bit exactly when the byte is above the threshold (OR-ed with the
+        byte's own high bit below 128, AND-ed above), so one add, mask and
+        multiply count eight pixels without materializing a threshold mask.
+        """
+        low7 = np.uint64(0x7F7F7F7F7F7F7F7F)
+        high = np.uint64(0x8080808080808080)
+        ones = np.uint64(0x0101010101010101)
+        below_128 = pix_thresh < 128
+        if below_128:
+            bias = np.uint64(127 - pix_thresh) * ones
+        else:
+            bias = np.uint64(255 - pix_thresh) * ones
+        count = np.uint64(0)
+        for i in prange(words.shape[0]):
+            x = words[i]
+            carry = (x & low7) + bias
+            above = (carry | x) if below_128 else (carry & x)
+            # Sum the eight 0/1 high bits into the top byte
+            count += (((above & high) >> np.uint64(7)) * ones) >> np.uint64(56)
+        for v in tail:
+            if v > pix_thresh:
+                count += np.uint64(1)
+        return count
+
+else:
+    _motion_kernel = None
+    _count_above = None
+
+
+# Rows diffed per step when early_exit is enabled
+_EARLY_EXIT_BAND_ROWS = 32
+
+
+# Pipelines MotionDetector can run ("auto" picks the fastest available)
+_BACKENDS = ("auto", "cuda", "gl", "numba", "opencl", "opencv")
+
+# Shaders for backend="gl". Each pass draws a full-screen quad; pixels are
+# addressed with texelFetch so nothing is filtered by the sampler.
+_GL_VERTEX_SHADER = """
+#version 140
+in vec2 in_pos;
+void main() {
+    gl_Position = vec4(in_pos, 0.0, 1.0);
+}
+"""
+
+# Luma, scale x scale area downscale (like INTER_AREA) and horizontal box blur
+_GL_LUMA_HBLUR_SHADER = """
+#version 140
+uniform sampler2D frame;
+uniform vec3 luma_weights;
+uniform int scale;
+uniform int radius;
+uniform int width;
+out float result;
+
+float luma(int x, int y) {
+    float acc = 0.0;
+    for (int dy = 0; dy < scale; dy++)
+        for (int dx = 0; dx < scale; dx++)
+            acc += dot(texelFetch(frame, ivec2(x * scale + dx, y * scale + dy), 0).rgb, luma_weights);
+    return acc / float(scale * scale);
+}
+
+int reflect101(int i, int n) {
+    return i < 0 ? -i : (i >= n ? 2 * n - 2 - i : i);
+}
+
+void main() {
+    ivec2 p = ivec2(gl_FragCoord.xy);
+    float acc = 0.0;
+    for (int t = -radius; t <= radius; t++)
+        acc += luma(reflect101(p.x + t, width), p.y);
+    result = acc / float(2 * radius + 1);
+}
+"""
+
+# Vertical box blur, written to the 8-bit current frame
+_GL_VBLUR_SHADER = """
+#version 140
+uniform sampler2D source;
+uniform int radius;
+uniform int height;
+out float result;
+
+int reflect101(int i, int n) {
+    return i < 0 ? -i : (i >= n ? 2 * n - 2 - i : i);
+}
+
+void main() {
+    ivec2 p = ivec2(gl_FragCoord.xy);
+    float acc = 0.0;
+    for (int t = -radius; t <= radius; t++)
+        acc += texelFetch(source, ivec2(p.x, reflect101(p.y + t, height)), 0).r;
+    result = acc / float(2 * radius + 1);
+}
+"""
+
+# 1.0 where the current and previous frames differ by more than threshold
+_GL_DIFF_SHADER = """
+#version 140
+uniform sampler2D previous;
+uniform sampler2D current;
+uniform float threshold;
+out float result;
+
+void main() {
+    ivec2 p = ivec2(gl_FragCoord.xy);
+    float diff = abs(texelFetch(current, p, 0).r - texelFetch(previous, p, 0).r);
+    result = round(diff * 255.0) > threshold ? 1.0 : 0.0;
+}
+"""
+
+
+def _cuda_available() -> bool:
+    """True if this OpenCV build has CUDA support and can see a GPU."""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+
+def _fixed_point_box(size: int) -> np.ndarray:
+    """1D box (mean) filter of this size as integers summing to 256."""
+    weights = np.full(size, 256 // size, dtype=np.int32)
+    weights[size // 2] += 256 - weights.sum()
+    return weights
+
+
+def _free_shared(shm: SharedMemory) -> None:
+    """Close and unlink a detector's SharedMemory block."""
+    try:
+        shm.close()
+    except BufferError:  # a previous_frame view is still alive (exit time)
+        pass
+    shm.unlink()
+
 
 class MotionDetector:
     """
@@ -18,6 +298,10 @@ class MotionDetector:
         pixel_threshold: int = 30,
         motion_threshold: float = 0.01,
         blur_size: int = 5,
+        scale: int = 2,
+        early_exit: bool = False,
+        backend: str = "auto",
+        shared: bool = False,
     ) -> None:
         """
         Initialize motion detector.
@@ -28,57 +312,564 @@ class MotionDetector:
             motion_threshold: What fraction of image must change to trigger?
                              (0.0-1.0, default 0.01 = 1%)
             blur_size: Size of blur kernel to reduce noise (odd number, default 5)
+            scale: Downscale factor applied before differencing (default 2 = half
+                  size, 4x fewer pixels). Downscaling also smooths noise, so at
+                  larger scales a blur_size of 3 is usually enough. Frames
+                  smaller than scale on either side are not downscaled.
+            early_exit: Stop diffing once motion_threshold is reached. motion_ratio
+                       is then only a lower bound and last_motion_box only covers
+                       the rows scanned. OpenCV backend only (the other backends
+                       process the whole frame in one pass); with "auto" it
+                       selects OpenCV.
+            backend: "cuda" (OpenCV CUDA modules, for machines with an NVIDIA
+                    GPU), "opencv", or "auto" to use CUDA when available and
+                    OpenCV otherwise. "numba" runs the fused single-pass CPU
+                    kernel (benchmarks slower than OpenCV on one core, so only
+                    worth it with several Numba threads), "gl" runs the pipeline
+                    as OpenGL shaders through moderngl to take the work off the
+                    CPU (e.g. Raspberry Pi 4/5) and "opencl" runs the OpenCV calls
+                    on an OpenCL device through UMat; none of these is picked by
+                    "auto".
+            shared: Keep previous_frame in a multiprocessing SharedMemory block so
+                   other processes can read it without copying: attach with
+                   SharedMemory(name=detector.shared_name) and wrap the buffer
+                   in an ndarray of previous_frame's shape. CPU backends only.
         """
+        if backend not in _BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {_BACKENDS}")
+        if shared and backend in ("cuda", "gl", "opencl"):
+            raise ValueError(f"shared=True keeps frames on the CPU, not supported by backend {backend!r}")
+        if early_exit and backend not in ("auto", "opencv"):
+            raise ValueError(f"early_exit=True is only supported by the opencv backend, not {backend!r}")
+        if backend == "gl":
+            try:
+                self._setup_gl()
+            except Exception as exc:  # ImportError, or no EGL/OpenGL 3.1 context
+                print(f"OpenGL motion detection not available ({exc}), falling back to CPU")
+                backend = "auto"
+        if backend == "opencl":
+            if cv2.ocl.haveOpenCL():
+                cv2.ocl.setUseOpenCL(True)
+            else:
+                print("OpenCL not available, falling back to CPU motion detection")
+                backend = "auto"
+        if backend == "cuda" and not _cuda_available():
+            print("OpenCV CUDA not available, falling back to CPU motion detection")
+            backend = "auto"
+        if backend == "numba" and _motion_kernel is None:
+            print("Numba not available, falling back to OpenCV motion detection")
+            backend = "opencv"
+        if backend == "auto":
+            backend = "cuda" if not (shared or early_exit) and _cuda_available() else "opencv"
+        self.backend = backend
+
         self.pixel_threshold = pixel_threshold
         self.motion_threshold = motion_threshold
         self.blur_size = blur_size
+        self.scale = scale
+        self.early_exit = early_exit
+        self._small: np.ndarray | None = None
+        # Integer form of motion_threshold for the current frame size
+        self._min_changed_key: tuple[int, float] | None = None
+        self._min_changed_count = 0
         self.previous_frame: np.ndarray | None = None
+        # Bounding box (x, y, w, h) of the changed pixels on the last motion hit
+        self.last_motion_box: tuple[int, int, int, int] | None = None
+        # Double buffer for the blurred gray frame (swapped with previous_frame
+        # every call) and buffers for the fused Numba kernel, allocated on the
+        # first frame
+        self._blur_weights = _fixed_point_box(blur_size)
+        self._gray_buf: np.ndarray | None = None
+        self._diff_buf: np.ndarray | None = None
+        self._scratch: np.ndarray | None = None
+        self._ring_rows: np.ndarray | None = None
+        self._row_first: np.ndarray | None = None
+        self._row_last: np.ndarray | None = None
+        # Previous blurred frame on the OpenCL device (backend="opencl")
+        self._umat_prev: cv2.UMat | None = None
+        self._umat_shape: tuple[int, int] | None = None
+        # SharedMemory block holding previous_frame when shared=True
+        self.shared = shared
+        self._shm: SharedMemory | None = None
+        self._shm_finalizer: weakref.finalize | None = None
+        if backend == "cuda":
+            self._setup_cuda()
 
     def has_motion(self, frame: np.ndarray) -> tuple[bool, float]:
         """
         Check if motion is detected in the current frame.
 
         Args:
-            frame: RGB frame from camera (numpy array, shape: HxWx3)
+            frame: BGR frame from camera (numpy array, shape: HxWx3), or an
+                   already grayscale frame such as a luma plane (shape: HxW)
 
         Returns:
             Tuple of (has_motion: bool, motion_ratio: float)
             motion_ratio is the fraction of pixels that changed (0.0-1.0)
+            On motion, last_motion_box holds the region that changed (in the
+            coordinates of frame).
         """
+        self.last_motion_box = None
         if frame is None:
             return False, 0.0
 
-        # Convert to grayscale
-        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+        scale = self._scale_for(frame.shape)
+        if self.backend == "cuda":
+            # Downscaled on the GPU after upload
+            has_motion, motion_ratio = self._has_motion_cuda(frame)
+        elif self.backend == "gl":
+            has_motion, motion_ratio = self._has_motion_gl(frame)
+        elif self.backend == "opencl":
+            has_motion, motion_ratio = self._has_motion_opencl(frame)
+        else:
+            if scale > 1:
+                frame = self._downscale(frame)
+            if self.backend == "numba":
+                has_motion, motion_ratio = self._has_motion_fused(frame)
+            else:
+                has_motion, motion_ratio = self._has_motion_opencv(frame)
+
+        if self.last_motion_box is not None and scale > 1:
+            self.last_motion_box = tuple(v * scale for v in self.last_motion_box)
+
+        return has_motion, motion_ratio
+
+    def _scale_for(self, shape: tuple[int, ...]) -> int:
+        """Downscale factor for frames of this shape (1 if smaller than scale)."""
+        if self.scale > 1 and min(shape[0], shape[1]) >= self.scale:
+            return self.scale
+        return 1
+
+    def _downscale(self, frame: np.ndarray) -> np.ndarray:
+        """Shrink the frame by self.scale with INTER_AREA into a reused buffer."""
+        height, width = frame.shape[:2]
+        scale = self._scale_for(frame.shape)
+        size = (width // scale, height // scale)
+        shape = (size[1], size[0]) + frame.shape[2:]
+        if self._small is None or self._small.shape != shape:
+            self._small = np.empty(shape, dtype=np.uint8)
+        cv2.resize(frame, size, dst=self._small, interpolation=cv2.INTER_AREA)
+        return self._small
 
-        # Apply blur to reduce noise
-        gray = cv2.GaussianBlur(gray, (self.blur_size, self.blur_size), 0)
+    def _has_motion_opencv(self, frame: np.ndarray) -> tuple[bool, float]:
+        """has_motion with one OpenCV call per pipeline step."""
+        first_frame = self._ensure_buffers(frame.shape[:2])
+        gray = self._gray_buf
+        ksize = (self.blur_size, self.blur_size)
+
+        # Convert to grayscale (luma frames already are) and blur to reduce
+        # noise, both written into the preallocated buffer. A box blur
+        # suppresses sensor noise as well as a Gaussian for frame differencing
+        # and needs no per-tap multiplies.
+        if frame.ndim == 2:
+            cv2.blur(frame, ksize, dst=gray)
+        else:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+            cv2.blur(gray, ksize, dst=gray)
 
         # If no previous frame, store this one and return no motion
-        if self.previous_frame is None:
-            self.previous_frame = gray.copy()
+        if first_frame:
+            self._swap_buffers()
             return False, 0.0
 
+        height = gray.shape[0]
+        total_pixels = gray.size
+        min_changed = self._min_changed(total_pixels)
+        if self.early_exit:
+            # Diff in bands of rows, stopping as soon as motion is certain
+            changed_pixels = 0
+            scanned_rows = height
+            for top in range(0, height, _EARLY_EXIT_BAND_ROWS):
+                bottom = min(top + _EARLY_EXIT_BAND_ROWS, height)
+                changed_pixels += self._count_changed(gray, slice(top, bottom))
+                if changed_pixels >= min_changed:
+                    scanned_rows = bottom
+                    break
+        else:
+            changed_pixels = self._count_changed(gray, slice(0, height))
+            scanned_rows = height
+        thresh = self._diff_buf[:scanned_rows]
+        motion_ratio = changed_pixels / total_pixels
+
+        # Check if motion threshold exceeded
+        has_motion = changed_pixels >= min_changed
+        if has_motion:
+            if _count_above is not None:
+                cv2.threshold(thresh, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=thresh)
+            self.last_motion_box = cv2.boundingRect(cv2.findNonZero(thresh))
+
+        # Update previous frame (swap buffers instead of copying)
+        self._swap_buffers()
+
+        return has_motion, motion_ratio
+
+    def _min_changed(self, total_pixels: int) -> int:
+        """Changed-pixel count that triggers motion in a frame of this many pixels."""
+        key = (total_pixels, self.motion_threshold)
+        if self._min_changed_key != key:
+            # Smallest count n with n / total_pixels >= motion_threshold, so the
+            # integer test matches the float ratio test exactly. The product
+            # is rounded (0.07 * 100 == 7.000000000000001), so step from its
+            # ceil to the exact boundary
+            count = max(math.ceil(self.motion_threshold * total_pixels), 0)
+            while count > 0 and (count - 1) / total_pixels >= self.motion_threshold:
+                count -= 1
+            while count / total_pixels < self.motion_threshold:
+                count += 1
+            self._min_changed_key = key
+            self._min_changed_count = count
+        return self._min_changed_count
+
+    def _count_changed(self, gray: np.ndarray, rows: slice) -> int:
+        """
+        Diff these rows against the previous frame into _diff_buf; count changes.
+
+        With Numba the count is taken straight from the diff and _diff_buf is
+        left unthresholded.
+        """
         # Calculate absolute difference
-        diff = cv2.absdiff(self.previous_frame, gray)
+        thresh = cv2.absdiff(self.previous_frame[rows], gray[rows], dst=self._diff_buf[rows])
 
-        # Threshold: pixels that changed significantly
-        _, thresh = cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)
+        if _count_above is not None:
+            flat = thresh.reshape(-1)
+            whole = flat.size - flat.size % 8
+            return int(_count_above(flat[:whole].view(np.uint64), flat[whole:], self.pixel_threshold))
 
-        # Count changed pixels
-        changed_pixels = np.sum(thresh > 0)
-        total_pixels = thresh.size
-        motion_ratio = changed_pixels / total_pixels
+        # Threshold: pixels that changed significantly (in place)
+        cv2.threshold(thresh, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=thresh)
 
-        # Update previous frame
-        self.previous_frame = gray.copy()
+        # Count changed pixels (single SIMD pass, no boolean temporary)
+        return cv2.countNonZero(thresh)
 
-        # Check if motion threshold exceeded
-        has_motion = motion_ratio >= self.motion_threshold
+    def _has_motion_fused(self, frame: np.ndarray) -> tuple[bool, float]:
+        """
+        has_motion in a single Numba pass over the frame.
+
+        Replaces the separate cvtColor, blur, absdiff, threshold and
+        count passes (each streaming the whole image through memory) with one
+        read of the frame and one write of the blurred gray buffer.
+        """
+        height, width = frame.shape[:2]
+        if frame.ndim == 2:
+            frame = frame[:, :, np.newaxis]
 
+        first_frame = self._ensure_buffers((height, width))
+
+        changed_pixels = _motion_kernel(
+            frame,
+            self.previous_frame,
+            self._gray_buf,
+            self._blur_weights,
+            self.pixel_threshold,
+            self._scratch,
+            self._ring_rows,
+            self._row_first,
+            self._row_last,
+        )
+        # This frame's blurred gray becomes the previous frame
+        self._swap_buffers()
+
+        # If no previous frame, store this one and return no motion
+        if first_frame:
+            return False, 0.0
+
+        motion_ratio = changed_pixels / (height * width)
+        has_motion = changed_pixels >= self._min_changed(height * width)
+        if has_motion:
+            rows = np.flatnonzero(self._row_last >= 0)
+            x = int(self._row_first[rows].min())
+            y = int(rows[0])
+            self.last_motion_box = (x, y, int(self._row_last[rows].max()) - x + 1, int(rows[-1]) - y + 1)
+
+        return has_motion, motion_ratio
+
+    def _setup_cuda(self) -> None:
+        """Create the CUDA stream, blur filter and device buffers."""
+        self._cuda_stream = cv2.cuda.Stream()
+        self._cuda_blur = cv2.cuda.createBoxFilter(
+            cv2.CV_8UC1, cv2.CV_8UC1, (self.blur_size, self.blur_size)
+        )
+        # Device buffers are sized by the first call that writes them and
+        # reused afterwards; _gpu_prev/_gpu_cur are swapped like the CPU buffers
+        self._gpu_frame = cv2.cuda_GpuMat()
+        self._gpu_small = cv2.cuda_GpuMat()
+        self._gpu_gray = cv2.cuda_GpuMat()
+        self._gpu_prev = cv2.cuda_GpuMat()
+        self._gpu_cur = cv2.cuda_GpuMat()
+        self._gpu_diff = cv2.cuda_GpuMat()
+        self._gpu_shape: tuple[int, int] | None = None
+
+    def _has_motion_cuda(self, frame: np.ndarray) -> tuple[bool, float]:
+        """
+        has_motion on the GPU.
+
+        The frame is uploaded once and every step runs on the device in one
+        stream; only the changed-pixel count comes back to the CPU (plus the
+        thresholded diff when there is motion, for the bounding box).
+        """
+        stream = self._cuda_stream
+        self._gpu_frame.upload(frame, stream)
+        src = self._gpu_frame
+
+        height, width = frame.shape[:2]
+        scale = self._scale_for(frame.shape)
+        if scale > 1:
+            width, height = width // scale, height // scale
+            cv2.cuda.resize(
+                src, (width, height), self._gpu_small,
+                interpolation=cv2.INTER_AREA, stream=stream,
+            )
+            src = self._gpu_small
+        if frame.ndim == 3:
+            cv2.cuda.cvtColor(src, cv2.COLOR_BGR2GRAY, self._gpu_gray, stream=stream)
+            src = self._gpu_gray
+        self._cuda_blur.apply(src, self._gpu_cur, stream)
+
+        # If no previous frame, store this one and return no motion
+        if self._gpu_shape != (height, width):
+            self._gpu_shape = (height, width)
+            self._gpu_prev, self._gpu_cur = self._gpu_cur, self._gpu_prev
+            return False, 0.0
+
+        cv2.cuda.absdiff(self._gpu_prev, self._gpu_cur, self._gpu_diff, stream=stream)
+        cv2.cuda.threshold(
+            self._gpu_diff, self.pixel_threshold, 255, cv2.THRESH_BINARY,
+            self._gpu_diff, stream=stream,
+        )
+        stream.waitForCompletion()
+        changed_pixels = cv2.cuda.countNonZero(self._gpu_diff)
+        motion_ratio = changed_pixels / (height * width)
+
+        has_motion = changed_pixels >= self._min_changed(height * width)
+        if has_motion:
+            thresh = self._gpu_diff.download()
+            self.last_motion_box = cv2.boundingRect(cv2.findNonZero(thresh))
+
+        # Update previous frame (swap buffers instead of copying)
+        self._gpu_prev, self._gpu_cur = self._gpu_cur, self._gpu_prev
+
+        return has_motion, motion_ratio
+
+    def _has_motion_opencl(self, frame: np.ndarray) -> tuple[bool, float]:
+        """
+        has_motion through OpenCV's Transparent API.
+
+        The same calls as the OpenCV path, on UMats, so OpenCV dispatches them
+        to OpenCL kernels; the previous frame stays on the device.
+        """
+        src = cv2.UMat(frame)
+        height, width = frame.shape[:2]
+        scale = self._scale_for(frame.shape)
+        if scale > 1:
+            width, height = width // scale, height // scale
+            src = cv2.resize(src, (width, height), interpolation=cv2.INTER_AREA)
+        if frame.ndim == 3:
+            src = cv2.cvtColor(src, cv2.COLOR_BGR2GRAY)
+        gray = cv2.blur(src, (self.blur_size, self.blur_size))
+
+        # If no previous frame, store this one and return no motion
+        if self._umat_shape != (height, width):
+            self._umat_shape = (height, width)
+            self._umat_prev = gray
+            return False, 0.0
+
+        thresh = cv2.absdiff(self._umat_prev, gray)
+        cv2.threshold(thresh, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=thresh)
+        changed_pixels = cv2.countNonZero(thresh)
+        motion_ratio = changed_pixels / (height * width)
+
+        has_motion = changed_pixels >= self._min_changed(height * width)
+        if has_motion:
+            self.last_motion_box = cv2.boundingRect(cv2.findNonZero(thresh.get()))
+
+        self._umat_prev = gray
         return has_motion, motion_ratio
 
+    def _setup_gl(self) -> None:
+        """Create a headless OpenGL context and compile the motion shaders."""
+        import moderngl
+
+        ctx = moderngl.create_context(standalone=True, backend="egl", require=310)
+        quad = ctx.buffer(np.array([-1, -1, 1, -1, -1, 1, 1, 1], dtype="f4"))
+        self._gl_ctx = ctx
+        self._gl_passes = {}
+        for name, shader in (
+            ("luma_hblur", _GL_LUMA_HBLUR_SHADER),
+            ("vblur", _GL_VBLUR_SHADER),
+            ("diff", _GL_DIFF_SHADER),
+        ):
+            program = ctx.program(vertex_shader=_GL_VERTEX_SHADER, fragment_shader=shader)
+            self._gl_passes[name] = (program, ctx.vertex_array(program, [(quad, "2f", "in_pos")]))
+        # Textures and framebuffers are allocated for the first frame's size
+        self._gl_shape: tuple[int, ...] | None = None
+
+    def _ensure_gl_buffers(self, shape: tuple[int, ...]) -> bool:
+        """
+        Allocate GL textures for this frame shape (HxWxC) if needed.
+
+        Returns True if there is no usable previous frame yet.
+        """
+        if self._gl_shape == shape:
+            return False
+
+        ctx = self._gl_ctx
+        height, width, channels = shape
+        scale = self._scale_for(shape)
+        small = (width // scale, height // scale)
+        self._gl_frame = ctx.texture((width, height), channels, dtype="f1")
+        blurred = ctx.texture(small, 1, dtype="f2")
+        self._gl_blurred_fbo = ctx.framebuffer(color_attachments=[blurred])
+        # Ping-pong pair like previous_frame/_gray_buf on the CPU
+        self._gl_prev = ctx.texture(small, 1, dtype="f1")
+        self._gl_cur = ctx.texture(small, 1, dtype="f1")
+        self._gl_prev_fbo = ctx.framebuffer(color_attachments=[self._gl_prev])
+        self._gl_cur_fbo = ctx.framebuffer(color_attachments=[self._gl_cur])
+        # The change mask is padded to a power-of-two square (the padding stays
+        # zero) so averaging it down the mipmap chain to 1x1 is exact
+        side = 1 << (max(small) - 1).bit_length()
+        self._gl_mask = ctx.texture((side, side), 1, dtype="f2")
+        self._gl_mask_fbo = ctx.framebuffer(color_attachments=[self._gl_mask])
+        self._gl_mask_fbo.clear()
+        self._gl_mask_fbo.viewport = (0, 0) + small
+        self._gl_mask_top_level = side.bit_length() - 1
+
+        radius = self.blur_size // 2
+        program = self._gl_passes["luma_hblur"][0]
+        program["luma_weights"].value = (1.0, 0.0, 0.0) if channels == 1 else (0.114, 0.587, 0.299)
+        program["scale"].value = scale
+        program["radius"].value = radius
+        program["width"].value = small[0]
+        program = self._gl_passes["vblur"][0]
+        program["radius"].value = radius
+        program["height"].value = small[1]
+        self._gl_passes["diff"][0]["current"].value = 1
+
+        self._gl_shape = shape
+        return True
+
+    def _gl_render(self, name: str, fbo, *textures) -> None:
+        """Run one shader pass into fbo, binding textures to units 0, 1, ..."""
+        for unit, texture in enumerate(textures):
+            texture.use(location=unit)
+        fbo.use()
+        self._gl_passes[name][1].render(self._gl_ctx.TRIANGLE_STRIP)
+
+    def _has_motion_gl(self, frame: np.ndarray) -> tuple[bool, float]:
+        """
+        has_motion as OpenGL shader passes.
+
+        Only the frame upload and a single 1x1 read of the averaged change
+        mask go through the CPU (plus the full mask when there is motion,
+        for the bounding box).
+        """
+        channels = 1 if frame.ndim == 2 else frame.shape[2]
+        first_frame = self._ensure_gl_buffers(frame.shape[:2] + (channels,))
+        self._gl_frame.write(np.ascontiguousarray(frame))
+
+        # Luma, downscale and blur into the current frame texture
+        self._gl_render("luma_hblur", self._gl_blurred_fbo, self._gl_frame)
+        self._gl_render("vblur", self._gl_cur_fbo, self._gl_blurred_fbo.color_attachments[0])
+
+        if first_frame:
+            self._gl_swap()
+            return False, 0.0
+
+        self._gl_passes["diff"][0]["threshold"].value = float(self.pixel_threshold)
+        self._gl_render("diff", self._gl_mask_fbo, self._gl_prev, self._gl_cur)
+        self._gl_mask.build_mipmaps()
+        mean = np.frombuffer(self._gl_mask.read(level=self._gl_mask_top_level), dtype=np.float16)[0]
+        width, height = self._gl_cur.size
+        side = self._gl_mask.width
+        changed_pixels = round(float(mean) * side * side)
+        motion_ratio = changed_pixels / (width * height)
+
+        has_motion = changed_pixels >= self._min_changed(width * height)
+        if has_motion:
+            mask = np.frombuffer(self._gl_mask.read(), dtype=np.float16).reshape(side, side)
+            thresh = (mask[:height, :width] > 0.5).astype(np.uint8)
+            self.last_motion_box = cv2.boundingRect(cv2.findNonZero(thresh))
+
+        self._gl_swap()
+        return has_motion, motion_ratio
+
+    def _gl_swap(self) -> None:
+        """This frame's blurred gray texture becomes the previous frame."""
+        self._gl_prev, self._gl_cur = self._gl_cur, self._gl_prev
+        self._gl_prev_fbo, self._gl_cur_fbo = self._gl_cur_fbo, self._gl_prev_fbo
+
+    def _ensure_buffers(self, shape: tuple[int, int]) -> bool:
+        """
+        Allocate the per-frame buffers for this frame size if needed.
+
+        Returns True if there is no usable previous frame yet.
+        """
+        if self.previous_frame is not None and self.previous_frame.shape == shape:
+            return False
+
+        height, width = shape
+        if self.shared:
+            self.previous_frame = self._shared_frame(shape)
+        else:
+            self.previous_frame = np.empty(shape, dtype=np.uint8)
+        self._gray_buf = np.empty(shape, dtype=np.uint8)
+        if self.backend == "numba":
+            bands = numba_config.NUMBA_NUM_THREADS
+            padded_width = width + 2 * (self.blur_size // 2)
+            self._scratch = np.empty((bands, self.blur_size + 2, padded_width), dtype=np.int32)
+            self._ring_rows = np.empty((bands, 2 * self.blur_size), dtype=np.int64)
+            self._row_first = np.empty(height, dtype=np.int32)
+            self._row_last = np.empty(height, dtype=np.int32)
+        else:
+            self._diff_buf = np.empty(shape, dtype=np.uint8)
+        return True
+
+    def _swap_buffers(self) -> None:
+        """Make the gray frame just computed (in _gray_buf) the previous frame."""
+        if self._shm is not None:
+            # The shared block stays where attached readers mapped it
+            np.copyto(self.previous_frame, self._gray_buf)
+        else:
+            self.previous_frame, self._gray_buf = self._gray_buf, self.previous_frame
+
+    def _shared_frame(self, shape: tuple[int, int]) -> np.ndarray:
+        """previous_frame backed by the SharedMemory block, (re)created if too small."""
+        size = shape[0] * shape[1]
+        if self._shm is None or self._shm.size < size:
+            self._release_shared()
+            self._shm = SharedMemory(create=True, size=size)
+            # Frees the block when the detector is collected or at exit, if
+            # close() was never called
+            self._shm_finalizer = weakref.finalize(self, _free_shared, self._shm)
+        return np.ndarray(shape, dtype=np.uint8, buffer=self._shm.buf)
+
+    def _release_shared(self) -> None:
+        """Free the SharedMemory block, if any."""
+        if self._shm is None:
+            return
+        self.previous_frame = None  # drop the view so the block can be closed
+        self._shm_finalizer()
+        self._shm = None
+
+    @property
+    def shared_name(self) -> str | None:
+        """Name of the SharedMemory block holding previous_frame (shared=True)."""
+        return self._shm.name if self._shm is not None else None
+
+    def close(self) -> None:
+        """Free the shared previous-frame block (shared=True)."""
+        self._release_shared()
+
     def reset(self) -> None:
         """Reset the detector (forgets previous frame)."""
+        if self._shm is not None and self.previous_frame is not None:
+            # Keep the shared block for attached readers, just clear it
+            self.previous_frame.fill(0)
         self.previous_frame = None
+        self.last_motion_box = None
+        if self.backend == "cuda":
+            self._gpu_shape = None
+        elif self.backend == "gl":
+            self._gl_shape = None
+        elif self.backend == "opencl":
+            self._umat_shape = None
 
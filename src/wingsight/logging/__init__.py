@@ -1,6 +1,6 @@
 """Logging utilities for WingSight detections."""
 
+from wingsight.logging.arrow_logger import ArrowLogger
 from wingsight.logging.csv_logger import CSVLogger
 
-__all__ = ["CSVLogger"]
-
+__all__ = ["CSVLogger", "ArrowLogger"]
@@ -0,0 +1,136 @@
+"""Arrow IPC logger for timestamped wildlife detections."""
+
+import atexit
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class ArrowLogger:
+    """
+    Binary detection logger, a drop-in alternative to CSVLogger.
+
+    Rows are typed (nanosecond timestamps, float32 confidences) and the
+    detection and image_path columns are dictionary-encoded: each distinct
+    name or path is written once per session (new ones go out as dictionary
+    deltas with the batch that first uses them). Each logger writes its own
+    Arrow IPC stream file, readable up to the last flushed batch even after
+    a crash; load one with pyarrow.ipc.open_stream(path).read_all().
+    Requires pyarrow.
+    """
+
+    def __init__(
+        self,
+        log_dir: str = "detections",
+        batch_size: int = 256,
+    ) -> None:
+        """
+        Initialize the Arrow logger.
+
+        Args:
+            log_dir: Directory for the session files (created if needed)
+            batch_size: Write a record batch after this many buffered rows
+        """
+        import pyarrow as pa
+        import pyarrow.ipc
+
+        self._pa = pa
+        self.batch_size = batch_size
+        self.schema = pa.schema(
+            [
+                ("timestamp", pa.timestamp("ns")),
+                ("detection", pa.dictionary(pa.int32(), pa.string())),
+                ("confidence", pa.float32()),
+                ("image_path", pa.dictionary(pa.int32(), pa.string())),
+            ]
+        )
+
+        # IPC streams cannot be appended to once closed, so one file per session
+        log_dir = Path(log_dir)
+        log_dir.mkdir(parents=True, exist_ok=True)
+        self.log_file = log_dir / f"detections_{time.time_ns()}.arrows"
+        self._sink = pa.OSFile(str(self.log_file), "wb")
+        self._writer = pyarrow.ipc.new_stream(
+            self._sink, self.schema,
+            options=pyarrow.ipc.IpcWriteOptions(emit_dictionary_deltas=True),
+        )
+
+        # Session-wide dictionaries (value -> index, values); they only grow,
+        # so each batch's dictionary extends the previous one
+        self._detection_dict: tuple[dict[str, int], list[str]] = ({}, [])
+        self._path_dict: tuple[dict[str, int], list[str]] = ({}, [])
+
+        # Buffered rows, string columns as dictionary indices
+        self._timestamps: list[int] = []
+        self._detections: list[int] = []
+        self._confidences: list[float] = []
+        self._image_paths: list[Optional[int]] = []
+        atexit.register(self.close)
+
+    def log_detection(
+        self,
+        detection: str,
+        confidence: float = 1.0,
+        image_path: Optional[str] = None,
+    ) -> None:
+        """
+        Log a detection event.
+
+        Args:
+            detection: Detection result (e.g., "bird", "no_bird")
+            confidence: Confidence score (0.0 to 1.0)
+            image_path: Optional path to saved image
+        """
+        self._timestamps.append(time.time_ns())
+        self._detections.append(self._intern(self._detection_dict, detection))
+        self._confidences.append(confidence)
+        self._image_paths.append(self._intern(self._path_dict, image_path) if image_path else None)
+        if len(self._timestamps) >= self.batch_size:
+            self.flush()
+
+    @staticmethod
+    def _intern(dictionary: tuple[dict[str, int], list[str]], value: str) -> int:
+        """Index of value in a session dictionary, adding it if new."""
+        ids, values = dictionary
+        index = ids.get(value)
+        if index is None:
+            index = ids[value] = len(values)
+            values.append(value)
+        return index
+
+    def _dictionary_array(self, indices: list, dictionary: tuple[dict[str, int], list[str]]):
+        """Dictionary-encoded column from buffered indices."""
+        pa = self._pa
+        return pa.DictionaryArray.from_arrays(
+            pa.array(indices, type=pa.int32()), pa.array(dictionary[1], type=pa.string())
+        )
+
+    def flush(self) -> None:
+        """Write buffered rows to the stream as one record batch."""
+        if not self._timestamps:
+            return
+        pa = self._pa
+        batch = pa.record_batch(
+            [
+                pa.array(self._timestamps, type=pa.timestamp("ns")),
+                self._dictionary_array(self._detections, self._detection_dict),
+                pa.array(self._confidences, type=pa.float32()),
+                self._dictionary_array(self._image_paths, self._path_dict),
+            ],
+            schema=self.schema,
+        )
+        self._writer.write_batch(batch)
+        self._sink.flush()
+        self._timestamps.clear()
+        self._detections.clear()
+        self._confidences.clear()
+        self._image_paths.clear()
+
+    def close(self) -> None:
+        """Write buffered rows and close the stream."""
+        if self._sink.closed:
+            return
+        self.flush()
+        self._writer.close()
+        self._sink.close()
+        atexit.unregister(self.close)
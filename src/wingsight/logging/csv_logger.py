@@ -1,30 +1,113 @@
 """CSV logger for timestamped wildlife detections."""
 
+import atexit
 import csv
+import os
+import queue
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 
+# Queue markers for the writer thread
+_FLUSH = object()
+_STOP = object()
+
+
 class CSVLogger:
     """Simple CSV logger for detection events with timestamps."""
 
-    def __init__(self, log_file: str = "detections.csv") -> None:
+    def __init__(
+        self,
+        log_file: str = "detections.csv",
+        batch_size: int = 32,
+        flush_interval_s: float = 5.0,
+        fast: bool = False,
+        intern_paths: bool = False,
+    ) -> None:
         """
         Initialize the CSV logger.
 
+        Rows are written by a background thread, so log_detection never
+        blocks on disk I/O. They reach the disk in batches, so rows are only
+        durable after close() (also run at normal interpreter exit, not when
+        the process is killed by a signal); flush() writes them out sooner.
+
         Args:
             log_file: Path to the CSV log file
+            batch_size: Flush to disk after this many buffered rows
+            flush_interval_s: Flush buffered rows to disk at least this often
+                             (seconds)
+            fast: Format rows directly instead of through csv.writer. Only for
+                 callers whose detection names and image paths never contain
+                 commas, quotes or newlines (no CSV quoting is applied).
+            intern_paths: Write each distinct image path once to
+                         <log stem>_paths.csv and log its integer id in the
+                         image_path column instead.
         """
+        if flush_interval_s <= 0:
+            raise ValueError(f"flush_interval_s must be positive, got {flush_interval_s}")
         self.log_file = Path(log_file)
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self._fast = fast
         self._ensure_header()
 
+        # The file stays open for the logger's lifetime; rows are buffered and
+        # written out in batches rather than reopening the file per detection
+        self._fh = open(self.log_file, "a", newline="", buffering=1 << 16)
+        self._writer = csv.writer(self._fh)
+        # (second, ISO date/time of that second), reformatted only when the
+        # second changes
+        self._ts_cache: tuple[int, str] = (-1, "")
+
+        # Path -> id table (intern_paths), only touched by the writer thread
+        self.paths_file: Optional[Path] = None
+        self._path_ids: dict[str, int] = {}
+        if intern_paths:
+            self.paths_file = self.log_file.with_name(f"{self.log_file.stem}_paths.csv")
+            self._load_path_ids()
+            self._paths_fh = open(self.paths_file, "a", newline="")
+            self._paths_writer = csv.writer(self._paths_fh)
+            if not self._path_ids and self._paths_fh.tell() == 0:
+                self._paths_writer.writerow(["path_id", "image_path"])
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._writer_loop, name="csv-logger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
     def _ensure_header(self) -> None:
         """Ensure CSV file has headers if it's new."""
-        if not self.log_file.exists():
-            with open(self.log_file, "w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow(["timestamp", "detection", "confidence", "image_path"])
+        # O_EXCL creates the file only if it does not exist, in one call, so
+        # of several processes starting together exactly one writes the header
+        try:
+            fd = os.open(self.log_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            return
+        with os.fdopen(fd, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["timestamp", "detection", "confidence", "image_path"])
+
+    def _load_path_ids(self) -> None:
+        """Reload the ids of a previous session so they stay stable."""
+        if not self.paths_file.exists():
+            return
+        with open(self.paths_file, newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)  # header
+            for path_id, image_path in reader:
+                self._path_ids[image_path] = int(path_id)
+
+    def _intern(self, image_path: str) -> str:
+        """Id of image_path in the paths table, adding it if new."""
+        path_id = self._path_ids.get(image_path)
+        if path_id is None:
+            path_id = self._path_ids[image_path] = len(self._path_ids)
+            self._paths_writer.writerow([path_id, image_path])
+        return str(path_id)
 
     def log_detection(
         self,
@@ -40,8 +123,67 @@ class CSVLogger:
             confidence: Confidence score (0.0 to 1.0)
             image_path: Optional path to saved image
         """
-        timestamp = datetime.now().isoformat()
-        with open(self.log_file, "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([timestamp, detection, confidence, image_path or ""])
+        self._queue.put_nowait((self._timestamp(), detection, confidence, image_path or ""))
+
+    def _timestamp(self) -> str:
+        """Local ISO 8601 timestamp with microseconds, like datetime.now().isoformat()."""
+        second, nanos = divmod(time.time_ns(), 1_000_000_000)
+        cached_second, prefix = self._ts_cache
+        if second != cached_second:
+            prefix = datetime.fromtimestamp(second).isoformat()
+            self._ts_cache = (second, prefix)
+        return f"{prefix}.{nanos // 1000:06d}"
+
+    def _writer_loop(self) -> None:
+        """Write queued rows, flushing every batch_size rows or flush_interval_s."""
+        pending = 0
+        last_flush = time.monotonic()
+        while True:
+            try:
+                row = self._queue.get(timeout=self.flush_interval_s)
+            except queue.Empty:
+                row = _FLUSH
+
+            if row is _STOP:
+                self._flush_files()
+                return
+            if row is not _FLUSH:
+                if self.paths_file is not None and row[3]:
+                    row = row[:3] + (self._intern(row[3]),)
+                if self._fast:
+                    # Same output as csv.writer for fields that need no quoting
+                    timestamp, detection, confidence, image_path = row
+                    self._fh.write(f"{timestamp},{detection},{confidence},{image_path}\r\n")
+                else:
+                    self._writer.writerow(row)
+                pending += 1
+
+            if pending and (
+                row is _FLUSH
+                or pending >= self.batch_size
+                or time.monotonic() - last_flush >= self.flush_interval_s
+            ):
+                self._flush_files()
+                pending = 0
+                last_flush = time.monotonic()
+
+    def _flush_files(self) -> None:
+        """Flush the paths table before the rows that refer to it."""
+        if self.paths_file is not None:
+            self._paths_fh.flush()
+        self._fh.flush()
+
+    def flush(self) -> None:
+        """Ask the writer thread to write buffered rows to disk."""
+        self._queue.put_nowait(_FLUSH)
 
+    def close(self) -> None:
+        """Write out all logged rows and close the log file."""
+        if self._fh.closed:
+            return
+        self._queue.put_nowait(_STOP)
+        self._thread.join()
+        self._fh.close()
+        if self.paths_file is not None:
+            self._paths_fh.close()
+        atexit.unregister(self.close)